@@ -1,21 +1,36 @@
 from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional
-from datetime import datetime
-import json
-import uuid
+from typing import AsyncIterator, Dict, List, Literal, Optional, Tuple, Union
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import secrets
 import os
+import logging
 import asyncio
-from openai import AsyncOpenAI
+import random
+import functools
+import time
+import orjson
+import msgspec
+from openai import AsyncOpenAI, DefaultAioHttpClient
+from redis.asyncio import Redis
+from redis.asyncio.client import Pipeline
 from dotenv import load_dotenv
 
 load_dotenv()
 
+logging.basicConfig(format="%(levelname)s: %(message)s")
+log = logging.getLogger("toefl")
+log.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+
 class QuizStartRequest(BaseModel):
     user_id: str = Field(..., description="Unique user identifier")
-    level: str = Field(..., description="Quiz difficulty level", 
-                       pattern="^(beginner|intermediate|advanced)$")
+    level: Literal["beginner", "intermediate", "advanced"] = Field(
+        ..., description="Quiz difficulty level"
+    )
     question_count: int = Field(
         default=10,
         ge=5,
@@ -71,6 +86,41 @@ class DashboardResponse(BaseModel):
     average_score: float
     recent_history: List[QuizHistoryItem]
 
+# msgspec mirrors of the response models above, encoded straight to JSON bytes
+# by MsgspecJSONResponse. The Pydantic models stay for request validation and docs.
+
+class QuestionResultStruct(msgspec.Struct):
+    question_number: int
+    user_answer: str
+    correct_answer: str
+    is_correct: bool
+
+class QuizSubmitStruct(msgspec.Struct):
+    session_id: str
+    score: float
+    total_questions: int
+    correct_count: int
+    results: List[QuestionResultStruct]
+
+class QuizHistoryItemStruct(msgspec.Struct):
+    session_id: str
+    date: str
+    level: str
+    score: float
+
+class DashboardStruct(msgspec.Struct):
+    user_id: str
+    current_level: str
+    total_quizzes: int
+    average_score: float
+    recent_history: List[QuizHistoryItemStruct]
+
+class MsgspecJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return msgspec.json.encode(content)
+
+_history_item_decoder = msgspec.json.Decoder(QuizHistoryItemStruct)
+
 app = FastAPI(
     title="TOEFL Vocabulary Training API",
     description="API for TOEFL vocabulary quiz generation and progress tracking",
@@ -87,218 +137,677 @@ app.add_middleware(
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 if not OPENAI_API_KEY:
-    print("WARNING: OPENAI_API_KEY not found in environment variables")
+    log.warning("OPENAI_API_KEY not found in environment variables")
 else:
-    print(f"INFO: OpenAI API key loaded (length: {len(OPENAI_API_KEY)})")
+    log.info("OpenAI API key loaded (length: %d)", len(OPENAI_API_KEY))
+
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "20"))
+OPENAI_SEMAPHORE = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+OPENAI_TIMEOUT_SECONDS = 30.0
+
+openai_client: Optional[AsyncOpenAI] = None
+
 
-openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+@app.on_event("startup")
+async def open_openai_client() -> None:
+    global openai_client
+    if OPENAI_API_KEY:
+        openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY, http_client=DefaultAioHttpClient())
 
-quiz_sessions: Dict[str, Dict] = {}
-quiz_results: Dict[str, Dict] = {}
-user_stats: Dict[str, Dict] = {}
+
+@app.on_event("shutdown")
+async def close_openai_client() -> None:
+    global openai_client
+    if openai_client:
+        await openai_client.close()
+        openai_client = None
 
 MAX_RECENT_HISTORY = 10
 
-def _ensure_user_record(user_id: str) -> Dict:
-    if user_id not in user_stats:
-        user_stats[user_id] = {
-            "current_level": "beginner",
-            "total_quizzes": 0,
-            "avg_score": 0.0,
-            "total_score": 0.0,
-            "recent_history": [],
-            "latest_quiz": None,
-        }
-    return user_stats[user_id]
+@dataclass(slots=True)
+class SessionRecord:
+    user_id: str
+    session_id: str
+    level: str
+    focus: Optional[str]
+    question_count: int
+    questions: List[dict]
+    correct_answers: List[str]
+    created_at: str
+
+@dataclass(slots=True)
+class UserRecord:
+    current_level: str = "beginner"
+    total_quizzes: int = 0
+    avg_score: float = 0.0
+    total_score: float = 0.0
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+SESSION_TTL_SECONDS = 3600
+RESULT_TTL_SECONDS = 30 * 24 * 3600
+
+redis_client: Optional[Redis] = None
+
+
+@app.on_event("startup")
+async def open_redis_client() -> None:
+    global redis_client
+    redis_client = Redis.from_url(REDIS_URL, decode_responses=True)
+
+
+@app.on_event("shutdown")
+async def close_redis_client() -> None:
+    global redis_client
+    if redis_client:
+        await redis_client.aclose()
+        redis_client = None
+
+def _session_key(session_id: str) -> str:
+    return f"session:{session_id}"
+
+def _result_key(session_id: str) -> str:
+    return f"result:{session_id}"
+
+def _user_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+def _history_key(user_id: str) -> str:
+    return f"history:{user_id}"
+
+QUIZ_CACHE_TTL_SECONDS = 60.0
+QUIZ_CACHE_MAX_ENTRIES = 32
+
+QuizCacheKey = Tuple[str, int, Optional[str]]
+
+QUIZ_BATCH_WINDOW_SECONDS = 0.05
+QUIZ_BATCH_MAX_SIZE = 4
+# A batch never asks for more questions than the largest single quiz, so it
+# fits the same max_tokens budget and OPENAI_TIMEOUT_SECONDS deadline.
+QUIZ_BATCH_MAX_QUESTIONS = 20
+
+_pending_generations: Dict[QuizCacheKey, asyncio.Task] = {}
+_generated_quizzes: "OrderedDict[QuizCacheKey, Tuple[float, List[dict]]]" = OrderedDict()
+
+_last_timestamp_second = -1
+_last_timestamp_iso = ""
+
+def utc_now_iso() -> str:
+    """Current UTC time in ISO 8601, formatted at most once per second."""
+    global _last_timestamp_second, _last_timestamp_iso
+    now = int(time.time())
+    if now != _last_timestamp_second:
+        _last_timestamp_second = now
+        _last_timestamp_iso = datetime.fromtimestamp(now, timezone.utc).isoformat()
+    return _last_timestamp_iso
+
+def _ensure_user_record(pipe: Pipeline, user_id: str) -> None:
+    defaults = UserRecord()
+    key = _user_key(user_id)
+    pipe.hsetnx(key, "current_level", defaults.current_level)
+    pipe.hsetnx(key, "total_quizzes", defaults.total_quizzes)
+    pipe.hsetnx(key, "total_score", defaults.total_score)
+
+# Everything that does not depend on the request lives in the system message so
+# every generation shares the same prompt prefix, which OpenAI can cache.
+SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": """You are a TOEFL vocabulary test expert who writes multiple-choice quiz questions.
+
+Every question must:
+- Test vocabulary understanding in context
+- Have exactly 4 plausible options
+- Have a correct_answer that exactly matches one of its options
+- Be appropriate for the TOEFL preparation level it is requested at
+
+Each question is a JSON object with this exact structure:
+{"question": "...", "options": ["A", "B", "C", "D"], "correct_answer": "A"}
+
+Return ONLY valid JSON, with no additional text."""
+}
+
+SINGLE_QUIZ_PROMPT = (
+    "Generate {question_count} questions at {level} level.\n"
+    "Return them as a JSON array of question objects."
+)
 
-async def generate_quiz_questions(level: str, question_count: int) -> List[dict]:
+BATCH_QUIZ_PROMPT = (
+    "Generate {quiz_count} separate quizzes:\n"
+    "{quiz_lines}\n"
+    "Return a JSON array containing one array of question objects per quiz, "
+    "in the order listed above."
+)
+
+def _quiz_messages(prompt: str) -> List[dict]:
+    return [SYSTEM_MESSAGE, {"role": "user", "content": prompt}]
+
+async def _request_quiz_json(prompt: str, max_tokens: int, timeout: float):
     if not openai_client:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Question generation service unavailable - API key not configured"
         )
-    
-    prompt = f"""Generate {question_count} TOEFL vocabulary multiple-choice questions at {level} level. 
-Each question should test vocabulary in context. 
-Return ONLY a JSON array with this exact structure, no additional text:
-[{{"question": "...", "options": ["A", "B", "C", "D"], "correct_answer": "A"}}]
-
-Make sure:
-- Questions test vocabulary understanding in context
-- All 4 options are plausible
-- Correct answer is clearly marked
-- Questions are appropriate for {level} level TOEFL preparation"""
 
     try:
-        print(f"INFO: Generating quiz questions for level: {level}")
-        response = await asyncio.wait_for(
-            openai_client.chat.completions.create(
-                model="gpt-4o-mini",  
-                messages=[
-                    {"role": "system", "content": "You are a TOEFL vocabulary test expert. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7, 
-                max_tokens=2000
-            ),
-            timeout=30.0  
-        )
-        print("INFO: Received response from OpenAI API")
-        
-        content = response.choices[0].message.content.strip()
-        
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        questions = json.loads(content)
+        async with OPENAI_SEMAPHORE:
+            response = await asyncio.wait_for(
+                openai_client.chat.completions.create(
+                    model="gpt-4o-mini",  
+                    messages=_quiz_messages(prompt),
+                    temperature=0.7, 
+                    max_tokens=max_tokens
+                ),
+                timeout=timeout
+            )
+        log.info("Received response from OpenAI API")
         
-        if len(questions) != question_count:
-            raise ValueError(f"Expected {question_count} questions, got {len(questions)}")
+        content = (
+            response.choices[0].message.content.strip()
+            .removeprefix("```json")
+            .removeprefix("```")
+            .removesuffix("```")
+            .strip()
+        )
         
-        return questions
+        return orjson.loads(content)
         
     except asyncio.TimeoutError:
-        print("ERROR: OpenAI API request timed out after 30 seconds")
+        log.error("OpenAI API request timed out after %.0f seconds", timeout)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Question generation service unavailable - request timeout. Please try again."
         )
-    except json.JSONDecodeError as e:
-        print(f"ERROR: Failed to parse JSON response: {str(e)}")
+    except orjson.JSONDecodeError as e:
+        log.error("Failed to parse JSON response: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to parse LLM response: {str(e)}"
         )
     except Exception as e:
-        print(f"ERROR: OpenAI API error: {type(e).__name__}: {str(e)}")
+        log.error("OpenAI API error: %s: %s", type(e).__name__, e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail=f"Question generation service unavailable: {str(e)}"
         )
 
-def save_quiz_session(user_id: str, session_id: str, level: str, 
-                      questions_json: str, question_count: int, focus: Optional[str]) -> str:
-    quiz_sessions[session_id] = {
-        "user_id": user_id,
-        "session_id": session_id,
-        "level": level,
-        "focus": focus,
-        "question_count": question_count,
-        "questions_json": questions_json,
-        "created_at": datetime.utcnow().isoformat()
-    }
-    _ensure_user_record(user_id)
-    print(f"Saving quiz session: {session_id} for user: {user_id}")
+def _question_count_mismatch(expected: int, actual: int) -> HTTPException:
+    log.error("Expected %d questions, got %d", expected, actual)
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=f"Question generation service unavailable: Expected {expected} questions, got {actual}"
+    )
+
+async def generate_quiz_questions(level: str, question_count: int) -> List[dict]:
+    prompt = SINGLE_QUIZ_PROMPT.format(level=level, question_count=question_count)
+    log.info("Generating quiz questions for level: %s", level)
+    questions = await _request_quiz_json(prompt, max_tokens=2000, timeout=OPENAI_TIMEOUT_SECONDS)
+    
+    if len(questions) != question_count:
+        raise _question_count_mismatch(question_count, len(questions))
+    
+    return questions
+
+class QuestionStreamParser:
+    r"""Pulls complete question objects out of a JSON array as its text arrives.
+
+    Tracks bracket depth outside of string literals; every object closed at the
+    top level of the array is decoded and returned from feed(). Anything other
+    than an array of objects raises ValueError. Run the examples below with
+    `python -m doctest main.py` from `server/`.
+
+    Chunks may split strings and escapes, and brackets inside strings are text:
+
+    >>> parser = QuestionStreamParser()
+    >>> parser.feed('```json\n[{"question": "a \\"[quoted]\\" {word}\\')
+    []
+    >>> parser.feed('\\", "options": ["A", "B", "C", "D"], "correct_answer": "A"}, {"qu')
+    [{'question': 'a "[quoted]" {word}\\', 'options': ['A', 'B', 'C', 'D'], 'correct_answer': 'A'}]
+    >>> parser.feed('estion": "b", "options": [], "correct_answer": ""}]\n```')
+    [{'question': 'b', 'options': [], 'correct_answer': ''}]
+
+    A reply wrapped in an object, or an array of arrays, is rejected:
+
+    >>> QuestionStreamParser().feed('{"questions": [{"question": "a"}]}')
+    Traceback (most recent call last):
+        ...
+    ValueError: Expected a JSON array of question objects
+    >>> QuestionStreamParser().feed('[[{"question": "a"}]]')
+    Traceback (most recent call last):
+        ...
+    ValueError: Expected a JSON array of question objects
+    """
+
+    def __init__(self) -> None:
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, text: str) -> List[dict]:
+        completed = []
+        for char in text:
+            if self._depth >= 2:
+                self._buffer.append(char)
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                if (self._depth == 0 and char != "[") or (self._depth == 1 and char != "{"):
+                    raise ValueError("Expected a JSON array of question objects")
+                self._depth += 1
+                if self._depth == 2:
+                    self._buffer = [char]
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 1:
+                    completed.append(orjson.loads("".join(self._buffer)))
+        return completed
+
+async def _read_quiz_stream(level: str, question_count: int,
+                            queue: "asyncio.Queue[Optional[dict]]") -> None:
+    parser = QuestionStreamParser()
+    stream = await openai_client.chat.completions.create(
+        model="gpt-4o-mini",
+        messages=_quiz_messages(
+            SINGLE_QUIZ_PROMPT.format(level=level, question_count=question_count)
+        ),
+        temperature=0.7,
+        max_tokens=2000,
+        stream=True
+    )
+    async for chunk in stream:
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+        for question in parser.feed(chunk.choices[0].delta.content):
+            queue.put_nowait(question)
+
+async def _pump_quiz_stream(level: str, question_count: int,
+                            queue: "asyncio.Queue[Optional[dict]]") -> None:
+    """Read the streamed completion into `queue`, ending it with None.
+
+    The deadline starts once an OpenAI slot is acquired, as in _request_quiz_json.
+    """
+    try:
+        async with OPENAI_SEMAPHORE:
+            await asyncio.wait_for(
+                _read_quiz_stream(level, question_count, queue),
+                timeout=OPENAI_TIMEOUT_SECONDS
+            )
+    finally:
+        queue.put_nowait(None)
+
+async def stream_quiz_questions(level: str, question_count: int) -> AsyncIterator[dict]:
+    """Yield each generated question as soon as the model finishes writing it.
+
+    The completion is read by a separate task so a slow consumer never holds an
+    OpenAI concurrency slot, and the generation itself is bounded by
+    OPENAI_TIMEOUT_SECONDS.
+    """
+    if not openai_client:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Question generation service unavailable - API key not configured"
+        )
+
+    log.info("Streaming quiz questions for level: %s", level)
+    queue: "asyncio.Queue[Optional[dict]]" = asyncio.Queue()
+    producer = asyncio.create_task(_pump_quiz_stream(level, question_count, queue))
+    try:
+        while (question := await queue.get()) is not None:
+            yield question
+        await producer
+    except asyncio.TimeoutError:
+        log.error("OpenAI API stream timed out after %.0f seconds", OPENAI_TIMEOUT_SECONDS)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Question generation service unavailable - request timeout. Please try again."
+        )
+    except ValueError as e:
+        log.error("Failed to parse streamed JSON question: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to parse LLM response: {str(e)}"
+        )
+    except Exception as e:
+        log.error("OpenAI API error: %s: %s", type(e).__name__, e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Question generation service unavailable: {str(e)}"
+        )
+    finally:
+        producer.cancel()
+
+async def generate_quiz_batch(
+    specs: List[Tuple[str, int]]
+) -> List[Union[List[dict], HTTPException]]:
+    """Generate several quizzes, one per (level, question_count) spec, in one request.
+
+    Each quiz is validated on its own: a malformed quiz comes back as the
+    HTTPException for that spec so the valid ones can still be handed out.
+    """
+    quiz_lines = "\n".join(
+        f"{idx + 1}. {question_count} questions at {level} level"
+        for idx, (level, question_count) in enumerate(specs)
+    )
+    prompt = BATCH_QUIZ_PROMPT.format(quiz_count=len(specs), quiz_lines=quiz_lines)
+
+    log.info("Generating %d quizzes in one batch", len(specs))
+    quizzes = await _request_quiz_json(
+        prompt, max_tokens=2000, timeout=OPENAI_TIMEOUT_SECONDS
+    )
+    
+    if not isinstance(quizzes, list):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Question generation service unavailable: Batch response is not a list of quizzes"
+        )
+    results: List[Union[List[dict], HTTPException]] = []
+    for idx, (_, question_count) in enumerate(specs):
+        questions = quizzes[idx] if idx < len(quizzes) else []
+        if not isinstance(questions, list) or len(questions) != question_count:
+            actual = len(questions) if isinstance(questions, list) else 0
+            results.append(_question_count_mismatch(question_count, actual))
+        else:
+            results.append(questions)
+    
+    return results
+
+class QuizGenerationBatcher:
+    """Groups quiz generations that arrive within a short window into one OpenAI call.
+
+    A background task dispatches a lone request immediately. When other
+    requests are already queued, or a dispatch is still in flight, it instead
+    collects requests for up to `window` seconds, until `max_size` are waiting,
+    or until the next one would push the batch past `max_questions` (that one
+    starts the following batch), and dispatches them together. A batch of one
+    uses the regular single-quiz prompt.
+    """
+
+    def __init__(self, window: float, max_size: int, max_questions: int) -> None:
+        self.window = window
+        self.max_size = max_size
+        self.max_questions = max_questions
+        self._queue: "asyncio.Queue[Tuple[str, int, asyncio.Future]]" = asyncio.Queue()
+        self._held: Optional[Tuple[str, int, asyncio.Future]] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches: set = set()
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        tasks = [self._worker, *self._dispatches] if self._worker else list(self._dispatches)
+        self._worker = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._held:
+            self._held[2].cancel()
+            self._held = None
+
+    async def generate(self, level: str, question_count: int) -> List[dict]:
+        if self._worker is None:
+            return await generate_quiz_questions(level, question_count)
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((level, question_count, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._held:
+                batch, self._held = [self._held], None
+            else:
+                batch = [await self._queue.get()]
+            total_questions = batch[0][1]
+            if not self._queue.empty() or self._dispatches:
+                deadline = loop.time() + self.window
+                while len(batch) < self.max_size:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    if total_questions + item[1] > self.max_questions:
+                        self._held = item
+                        break
+                    batch.append(item)
+                    total_questions += item[1]
+            task = asyncio.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: List[Tuple[str, int, asyncio.Future]]) -> None:
+        try:
+            if len(batch) == 1:
+                level, question_count, _ = batch[0]
+                quizzes = [await generate_quiz_questions(level, question_count)]
+            else:
+                quizzes = await generate_quiz_batch([(level, count) for level, count, _ in batch])
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                future.cancel()
+            raise
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, _, future), questions in zip(batch, quizzes):
+            if future.done():
+                continue
+            if isinstance(questions, Exception):
+                future.set_exception(questions)
+            else:
+                future.set_result(questions)
+
+quiz_batcher = QuizGenerationBatcher(
+    window=QUIZ_BATCH_WINDOW_SECONDS,
+    max_size=QUIZ_BATCH_MAX_SIZE,
+    max_questions=QUIZ_BATCH_MAX_QUESTIONS
+)
+
+@app.on_event("startup")
+async def start_quiz_batcher() -> None:
+    quiz_batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_quiz_batcher() -> None:
+    await quiz_batcher.stop()
+
+async def _generate_and_cache(key: QuizCacheKey) -> List[dict]:
+    level, question_count, _ = key
+    questions = await quiz_batcher.generate(level, question_count)
+    _generated_quizzes[key] = (time.monotonic(), questions)
+    _generated_quizzes.move_to_end(key)
+    while len(_generated_quizzes) > QUIZ_CACHE_MAX_ENTRIES:
+        _generated_quizzes.popitem(last=False)
+    return questions
+
+def _finish_generation(key: QuizCacheKey, task: asyncio.Task) -> None:
+    if _pending_generations.get(key) is task:
+        del _pending_generations[key]
+    if not task.cancelled():
+        # Mark the exception as retrieved in case every waiter went away.
+        task.exception()
+
+async def get_or_generate_quiz_questions(level: str, question_count: int,
+                                         focus: Optional[str]) -> List[dict]:
+    """Return questions for a quiz, sharing one generation between identical requests.
+
+    Question sets generated within the last QUIZ_CACHE_TTL_SECONDS are reused,
+    and concurrent requests for the same key wait on the generation already in
+    flight instead of issuing their own. The generation runs in its own task,
+    so a caller that disconnects neither cancels nor repeats it for the others.
+    Each caller gets its own shuffled order.
+    """
+    key = (level, question_count, focus)
+    cached = _generated_quizzes.get(key)
+    if cached and time.monotonic() - cached[0] < QUIZ_CACHE_TTL_SECONDS:
+        _generated_quizzes.move_to_end(key)
+        questions = cached[1]
+    else:
+        task = _pending_generations.get(key)
+        if task is None:
+            task = asyncio.create_task(_generate_and_cache(key))
+            _pending_generations[key] = task
+            task.add_done_callback(functools.partial(_finish_generation, key))
+        questions = await asyncio.shield(task)
+
+    return random.sample(questions, len(questions))
+
+async def save_quiz_session(user_id: str, session_id: str, level: str, 
+                            questions: List[dict], question_count: int, focus: Optional[str]) -> str:
+    record = SessionRecord(
+        user_id=user_id,
+        session_id=session_id,
+        level=level,
+        focus=focus,
+        question_count=question_count,
+        questions=questions,
+        correct_answers=[q["correct_answer"] for q in questions],
+        created_at=utc_now_iso()
+    )
+    log.debug("Saving quiz session: %s for user: %s", session_id, user_id)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(_session_key(session_id), orjson.dumps(record), ex=SESSION_TTL_SECONDS)
+        _ensure_user_record(pipe, user_id)
+        await pipe.execute()
     return session_id
 
-def get_quiz_session(session_id: str) -> Optional[dict]:
-    print(f"Getting quiz session: {session_id}")
-    return quiz_sessions.get(session_id)
+async def get_quiz_session(session_id: str) -> Optional[SessionRecord]:
+    log.debug("Getting quiz session: %s", session_id)
+    raw = await redis_client.get(_session_key(session_id))
+    return SessionRecord(**orjson.loads(raw)) if raw else None
 
-def save_quiz_result(user_id: str, session_id: str, score: float, 
-                     total: int, answers: List[str]) -> None:
-    submitted_at = datetime.utcnow().isoformat()
-    session_data = quiz_sessions.get(session_id, {})
-    quiz_results[session_id] = {
+async def save_quiz_result(user_id: str, session_data: SessionRecord, score: float, 
+                           total: int, answers: List[str]) -> None:
+    submitted_at = utc_now_iso()
+    session_id = session_data.session_id
+    result = {
         "session_id": session_id,
         "user_id": user_id,
         "score": round(score, 2),
         "total_questions": total,
         "answers": answers,
-        "level": session_data.get("level"),
-        "focus": session_data.get("focus"),
+        "level": session_data.level,
+        "focus": session_data.focus,
         "submitted_at": submitted_at
     }
-    print(f"Saving result for session: {session_id}, score: {score}")
-    update_user_progress(
-        user_id=user_id,
-        new_score=score,
-        session_data=session_data,
-        submitted_at=submitted_at,
-        total_questions=total,
-        session_id=session_id
-    )
+    log.debug("Saving result for session: %s, score: %s", session_id, score)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.set(_result_key(session_id), orjson.dumps(result), ex=RESULT_TTL_SECONDS)
+        update_user_progress(
+            pipe,
+            user_id=user_id,
+            new_score=score,
+            session_data=session_data,
+            submitted_at=submitted_at,
+            total_questions=total,
+            session_id=session_id
+        )
+        await pipe.execute()
 
-def get_user_stats(user_id: str) -> Optional[dict]:
-    print(f"Getting stats for user: {user_id}")
-    return user_stats.get(user_id)
+async def get_user_stats(user_id: str) -> Optional[UserRecord]:
+    log.debug("Getting stats for user: %s", user_id)
+    current_level, total_quizzes, total_score = await redis_client.hmget(
+        _user_key(user_id), "current_level", "total_quizzes", "total_score"
+    )
+    if current_level is None:
+        return None
+    total_quizzes = int(total_quizzes)
+    total_score = float(total_score)
+    return UserRecord(
+        current_level=current_level,
+        total_quizzes=total_quizzes,
+        avg_score=total_score / total_quizzes if total_quizzes else 0.0,
+        total_score=total_score
+    )
 
-def get_quiz_history(user_id: str, limit: int = 5) -> List[dict]:
-    print(f"Getting history for user: {user_id}")
-    record = user_stats.get(user_id)
-    if not record:
-        return []
-    return record.get("recent_history", [])[:limit]
+async def get_quiz_history(user_id: str, limit: int = 5) -> List[QuizHistoryItemStruct]:
+    log.debug("Getting history for user: %s", user_id)
+    entries = await redis_client.lrange(_history_key(user_id), 0, limit - 1)
+    return [_history_item_decoder.decode(entry) for entry in entries]
 
-def update_user_progress(user_id: str, new_score: float, 
-                         session_data: Optional[dict] = None,
+def update_user_progress(pipe: Pipeline, user_id: str, new_score: float, 
+                         session_data: Optional[SessionRecord] = None,
                          submitted_at: Optional[str] = None,
                          total_questions: Optional[int] = None,
-                         session_id: Optional[str] = None) -> dict:
-    record = _ensure_user_record(user_id)
-    record["total_quizzes"] += 1
-    record["total_score"] += new_score
-    record["avg_score"] = record["total_score"] / record["total_quizzes"]
-    level = session_data.get("level") if session_data else record["current_level"]
+                         session_id: Optional[str] = None) -> None:
+    """Queue the stats and history updates for a finished quiz on `pipe`.
+
+    Counters are bumped with HINCRBY/HINCRBYFLOAT so concurrent workers never
+    lose an update; the average is derived from them on read.
+    """
+    key = _user_key(user_id)
+    _ensure_user_record(pipe, user_id)
+    pipe.hincrby(key, "total_quizzes", 1)
+    pipe.hincrbyfloat(key, "total_score", new_score)
+    level = session_data.level if session_data else None
     if level:
-        record["current_level"] = level
-    timestamp = submitted_at or datetime.utcnow().isoformat()
+        pipe.hset(key, "current_level", level)
+    timestamp = submitted_at or utc_now_iso()
     latest_quiz = {
-        "session_id": session_id or (session_data.get("session_id") if session_data else None),
+        "session_id": session_id or (session_data.session_id if session_data else None),
         "score": round(new_score, 2),
-        "total": total_questions or (session_data.get("question_count") if session_data else None),
+        "total": total_questions or (session_data.question_count if session_data else None),
         "level": level or "beginner",
-        "focus": (session_data.get("focus") if session_data else None) or "Vocabulary",
+        "focus": (session_data.focus if session_data else None) or "Vocabulary",
         "submitted_at": timestamp
     }
-    record["latest_quiz"] = latest_quiz
+    pipe.hset(key, "latest_quiz", orjson.dumps(latest_quiz))
     history_entry = {
         "session_id": latest_quiz["session_id"],
         "date": timestamp,
         "level": latest_quiz["level"],
         "score": latest_quiz["score"],
     }
-    record["recent_history"].insert(0, history_entry)
-    record["recent_history"] = record["recent_history"][:MAX_RECENT_HISTORY]
-    return record
+    history_key = _history_key(user_id)
+    pipe.lpush(history_key, orjson.dumps(history_entry))
+    pipe.ltrim(history_key, 0, MAX_RECENT_HISTORY - 1)
 
 
-@app.post("/api/quiz/start", response_model=QuizStartResponse, 
-          status_code=status.HTTP_200_OK)
+@app.post("/api/quiz/start", responses={200: {"model": QuizStartResponse}},
+          response_class=ORJSONResponse, status_code=status.HTTP_200_OK)
 async def start_quiz(request: QuizStartRequest):
     try:
-        session_id = str(uuid.uuid4())
-        questions_data = await generate_quiz_questions(request.level, request.question_count)
-        questions_json = json.dumps(questions_data)
-        save_quiz_session(
+        session_id = secrets.token_hex(16)
+        questions_data = await get_or_generate_quiz_questions(
+            request.level, request.question_count, request.focus
+        )
+        await save_quiz_session(
             user_id=request.user_id,
             session_id=session_id,
             level=request.level,
-            questions_json=questions_json,
+            questions=questions_data,
             question_count=request.question_count,
             focus=request.focus
         )
         
         questions_for_response = [
-            Question(
-                question_number=idx + 1,
-                question=q["question"],
-                options=q["options"]
-            )
+            {
+                "question_number": idx + 1,
+                "question": q["question"],
+                "options": q["options"]
+            }
             for idx, q in enumerate(questions_data)
         ]
         
-        return QuizStartResponse(
-            session_id=session_id,
-            level=request.level,
-            total_questions=len(questions_data),
-            questions=questions_for_response
-        )
+        return ORJSONResponse({
+            "session_id": session_id,
+            "level": request.level,
+            "total_questions": len(questions_data),
+            "questions": questions_for_response
+        })
         
     except HTTPException:
         raise
@@ -309,11 +818,68 @@ async def start_quiz(request: QuizStartRequest):
         )
 
 
-@app.get("/api/quiz/questions/{session_id}", response_model=QuizStartResponse,
-         status_code=status.HTTP_200_OK)
+@app.post("/api/quiz/start/stream", status_code=status.HTTP_200_OK)
+async def start_quiz_stream(request: QuizStartRequest):
+    """Start a quiz and stream it back as NDJSON while the questions are generated.
+
+    The first line describes the session, each following line is one question,
+    and a failure after streaming has begun is reported as a final error line.
+    The session is saved, and can be submitted, once every question has arrived.
+    """
+    session_id = secrets.token_hex(16)
+    questions = stream_quiz_questions(request.level, request.question_count)
+    try:
+        first_question = await anext(questions)
+    except StopAsyncIteration:
+        raise _question_count_mismatch(request.question_count, 0)
+
+    async def ndjson_lines() -> AsyncIterator[bytes]:
+        yield orjson.dumps({
+            "type": "session",
+            "session_id": session_id,
+            "level": request.level,
+            "total_questions": request.question_count
+        }) + b"\n"
+        questions_data = []
+        try:
+            question = first_question
+            while True:
+                questions_data.append(question)
+                yield orjson.dumps({
+                    "type": "question",
+                    "question_number": len(questions_data),
+                    "question": question["question"],
+                    "options": question["options"]
+                }) + b"\n"
+                question = await anext(questions, None)
+                if question is None:
+                    break
+            if len(questions_data) != request.question_count:
+                raise _question_count_mismatch(request.question_count, len(questions_data))
+            await save_quiz_session(
+                user_id=request.user_id,
+                session_id=session_id,
+                level=request.level,
+                questions=questions_data,
+                question_count=request.question_count,
+                focus=request.focus
+            )
+        except HTTPException as e:
+            yield orjson.dumps({"type": "error", "detail": e.detail}) + b"\n"
+        except Exception as e:
+            log.error("Failed to stream quiz %s: %s", session_id, e)
+            yield orjson.dumps({"type": "error", "detail": f"Failed to start quiz: {str(e)}"}) + b"\n"
+        finally:
+            await questions.aclose()
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+
+@app.get("/api/quiz/questions/{session_id}", responses={200: {"model": QuizStartResponse}},
+         response_class=ORJSONResponse, status_code=status.HTTP_200_OK)
 async def get_quiz_questions(session_id: str):
     try:
-        session_data = get_quiz_session(session_id)
+        session_data = await get_quiz_session(session_id)
         
         if not session_data:
             raise HTTPException(
@@ -321,22 +887,22 @@ async def get_quiz_questions(session_id: str):
                 detail="Quiz session not found"
             )
         
-        questions_data = json.loads(session_data["questions_json"])
+        questions_data = session_data.questions
         questions_for_response = [
-            Question(
-                question_number=idx + 1,
-                question=q["question"],
-                options=q["options"]
-            )
+            {
+                "question_number": idx + 1,
+                "question": q["question"],
+                "options": q["options"]
+            }
             for idx, q in enumerate(questions_data)
         ]
         
-        return QuizStartResponse(
-            session_id=session_id,
-            level=session_data["level"],
-            total_questions=session_data.get("question_count", len(questions_data)),
-            questions=questions_for_response
-        )
+        return ORJSONResponse({
+            "session_id": session_id,
+            "level": session_data.level,
+            "total_questions": session_data.question_count,
+            "questions": questions_for_response
+        })
         
     except HTTPException:
         raise
@@ -347,11 +913,11 @@ async def get_quiz_questions(session_id: str):
         )
 
 
-@app.post("/api/quiz/submit", response_model=QuizSubmitResponse,
-          status_code=status.HTTP_200_OK)
+@app.post("/api/quiz/submit", responses={200: {"model": QuizSubmitResponse}},
+          response_class=MsgspecJSONResponse, status_code=status.HTTP_200_OK)
 async def submit_quiz(request: QuizSubmitRequest):
     try:
-        session_data = get_quiz_session(request.session_id)
+        session_data = await get_quiz_session(request.session_id)
         
         if not session_data:
             raise HTTPException(
@@ -359,52 +925,48 @@ async def submit_quiz(request: QuizSubmitRequest):
                 detail="Quiz session not found"
             )
         
-        if session_data["user_id"] != request.user_id:
+        if session_data.user_id != request.user_id:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="User ID does not match quiz session"
             )
         
-        questions_data = json.loads(session_data["questions_json"])
-        if len(request.answers) != len(questions_data):
+        correct_answers = session_data.correct_answers
+        if len(request.answers) != len(correct_answers):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Number of answers does not match quiz questions"
             )
-        results = []
-        correct_count = 0
-        
-        for idx, (user_answer, question) in enumerate(zip(request.answers, questions_data)):
-            correct_answer = question["correct_answer"]
-            is_correct = user_answer == correct_answer
-            
-            if is_correct:
-                correct_count += 1
-            
-            results.append(QuestionResult(
-                question_number=idx + 1,
+        results = [
+            QuestionResultStruct(
+                question_number=idx,
                 user_answer=user_answer,
                 correct_answer=correct_answer,
-                is_correct=is_correct
-            ))
+                is_correct=user_answer == correct_answer
+            )
+            for idx, (user_answer, correct_answer) in enumerate(
+                zip(request.answers, correct_answers), start=1
+            )
+        ]
+        correct_count = sum(result.is_correct for result in results)
         
-        total_questions = len(questions_data)
+        total_questions = len(correct_answers)
         score = (correct_count / total_questions) * 100
-        save_quiz_result(
+        await save_quiz_result(
             user_id=request.user_id,
-            session_id=request.session_id,
+            session_data=session_data,
             score=score,
             total=total_questions,
             answers=request.answers
         )
         
-        return QuizSubmitResponse(
+        return MsgspecJSONResponse(QuizSubmitStruct(
             session_id=request.session_id,
             score=round(score, 2),
             total_questions=total_questions,
             correct_count=correct_count,
             results=results
-        )
+        ))
         
     except HTTPException:
         raise
@@ -415,11 +977,11 @@ async def submit_quiz(request: QuizSubmitRequest):
         )
 
 
-@app.get("/api/dashboard/{user_id}", response_model=DashboardResponse,
-         status_code=status.HTTP_200_OK)
+@app.get("/api/dashboard/{user_id}", responses={200: {"model": DashboardResponse}},
+         response_class=MsgspecJSONResponse, status_code=status.HTTP_200_OK)
 async def get_dashboard(user_id: str):
     try:
-        user_stats = get_user_stats(user_id)
+        user_stats = await get_user_stats(user_id)
         
         if not user_stats:
             raise HTTPException(
@@ -427,25 +989,15 @@ async def get_dashboard(user_id: str):
                 detail="User not found"
             )
         
-        quiz_history = get_quiz_history(user_id, limit=5)
+        quiz_history = await get_quiz_history(user_id, limit=5)
         
-        history_items = [
-            QuizHistoryItem(
-                session_id=quiz["session_id"],
-                date=quiz["date"],
-                level=quiz["level"],
-                score=round(quiz["score"], 2)
-            )
-            for quiz in quiz_history
-        ]
-        
-        return DashboardResponse(
+        return MsgspecJSONResponse(DashboardStruct(
             user_id=user_id,
-            current_level=user_stats["current_level"],
-            total_quizzes=user_stats["total_quizzes"],
-            average_score=round(user_stats["avg_score"], 2),
-            recent_history=history_items
-        )
+            current_level=user_stats.current_level,
+            total_quizzes=user_stats.total_quizzes,
+            average_score=round(user_stats.avg_score, 2),
+            recent_history=quiz_history
+        ))
         
     except HTTPException:
         raise
@@ -460,7 +1012,7 @@ async def get_dashboard(user_id: str):
 async def health_check():
     return {
         "status": "healthy",
-        "timestamp": datetime.utcnow().isoformat(),
+        "timestamp": utc_now_iso(),
         "openai_configured": OPENAI_API_KEY is not None
     }
 